@@ -1,11 +1,21 @@
 from __future__ import annotations
 
 import logging
-import queue
+import re
+import secrets
+import shlex
+import struct
+import sys
 import threading
-from dataclasses import dataclass
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Callable, Iterable, KeysView, Optional
 
-from .models import EmulatorDescriptor, FrameEvent
+import paramiko
+
+from .models import EmulatorDescriptor, FrameEvent, RawFrame
 from .ssh_client import SSHSession
 
 logger = logging.getLogger(__name__)
@@ -13,12 +23,82 @@ logger = logging.getLogger(__name__)
 # Default adb executable path
 DEFAULT_ADB_PATH = "/data7/Users/xyq/develop/gui-agent/sdk/platform-tools/adb"
 
+_RECV_CHUNK_SIZE = 256 * 1024
+_INITIAL_BUFFER_SIZE = 2_000_000
+# Separates per-serial probe output in batched adb invocations
+_SECTION_MARKER = "@@ew-serial@@"
+# Bytes per pixel for the android::PixelFormat values screencap can emit
+_RAW_BYTES_PER_PIXEL = {1: 4, 2: 4, 3: 3, 4: 2, 5: 4}
+# Matches online emulators in `adb devices` output, e.g. "emulator-5554\tdevice"
+_EMULATOR_LINE_RE = re.compile(r"^(emulator-(\d+))\s+device\s*$", re.MULTILINE)
+# Caps concurrent captures so large farms share a bounded set of threads
+MAX_CAPTURE_WORKERS = 8
+
+
+class _AdbShell:
+    """Persistent ``adb shell`` channel that frames command output with a sentinel."""
+
+    def __init__(self, channel: paramiko.Channel) -> None:
+        self._channel = channel
+        self._marker = f"__EW_{secrets.token_hex(8)}__"
+        self._sentinel = f"{self._marker}\n".encode()
+        # Reused across captures; only the first ``_filled`` bytes are meaningful
+        self._buffer = bytearray(_INITIAL_BUFFER_SIZE)
+        self._filled = 0
+
+    def execute(self, command: str) -> bytes:
+        self._channel.sendall(f"{command}; echo {self._marker}\n".encode())
+        sentinel = self._sentinel
+        search_from = 0
+        while (end := self._buffer.find(sentinel, search_from, self._filled)) < 0:
+            search_from = max(0, self._filled - len(sentinel) + 1)
+            chunk = self._channel.recv(_RECV_CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("adb shell channel closed")
+            self._append(chunk)
+        with memoryview(self._buffer) as view:
+            output = view[:end].tobytes()
+        consumed = end + len(sentinel)
+        leftover = self._filled - consumed
+        self._buffer[:leftover] = self._buffer[consumed : self._filled]
+        self._filled = leftover
+        self._log_stderr()
+        return output
+
+    def _append(self, chunk: bytes) -> None:
+        needed = self._filled + len(chunk)
+        if needed > len(self._buffer):
+            # Grow geometrically so large frames settle into a stable allocation
+            grow_to = max(needed, len(self._buffer) * 2)
+            self._buffer.extend(bytes(grow_to - len(self._buffer)))
+        self._buffer[self._filled : needed] = chunk
+        self._filled = needed
+
+    def close(self) -> None:
+        self._channel.close()
+
+    def _log_stderr(self) -> None:
+        while self._channel.recv_stderr_ready():
+            message = self._channel.recv_stderr(_RECV_CHUNK_SIZE)
+            if message:
+                logger.warning(
+                    "adb shell stderr: %s", message.decode("utf-8", errors="ignore")
+                )
+
 
 @dataclass(slots=True)
-class _WorkerHandle:
+class _StreamHandle:
     descriptor: EmulatorDescriptor
-    stop_event: threading.Event
-    thread: threading.Thread
+    shell: Optional[_AdbShell] = None
+    active: bool = True
+    busy: bool = False
+    # Single-producer/single-consumer slot holding the newest undelivered frame
+    frames: deque[FrameEvent] = field(default_factory=lambda: deque(maxlen=1))
+
+    def close_shell(self) -> None:
+        if self.shell is not None:
+            self.shell.close()
+            self.shell = None
 
 
 class ADBService:
@@ -29,92 +109,220 @@ class ADBService:
         ssh_session: SSHSession,
         interval: float = 1.0,
         adb_executable: str = DEFAULT_ADB_PATH,
+        on_frame: Optional[Callable[[str], None]] = None,
     ) -> None:
         self.ssh_session = ssh_session
-        self.frame_queue: queue.Queue[FrameEvent] = queue.Queue()
+        # Called from capture threads with the serial whose ring has a new frame
+        self.on_frame = on_frame
         self.interval = interval
-        self._workers: dict[str, _WorkerHandle] = {}
+        self._streams: dict[str, _StreamHandle] = {}
         self._lock = threading.RLock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._scheduler: Optional[threading.Thread] = None
+        self._scheduler_stop = threading.Event()
         self.adb_executable = adb_executable
 
     def list_emulators(self) -> list[EmulatorDescriptor]:
-        result = self.ssh_session.run(f"{self.adb_executable} devices", timeout=10)
-        if not result.ok:
-            logger.warning(
-                "adb devices failed: %s", result.stderr.decode("utf-8", errors="ignore")
-            )
-            return []
-
-        lines = result.stdout.decode("utf-8", errors="ignore").splitlines()
-        descriptors: list[EmulatorDescriptor] = []
-        for line in lines[1:]:
-            line = line.strip()
-            if not line or "device" not in line:
-                continue
-            serial, status = line.split()
-            if not serial.startswith("emulator-") or status != "device":
-                continue
-            port = _serial_to_port(serial)
-            descriptors.append(EmulatorDescriptor(serial=serial, port=port))
+        descriptors, _ = self.enumerate_and_prime(())
         return descriptors
 
+    def enumerate_and_prime(
+        self, serials: Iterable[str]
+    ) -> tuple[list[EmulatorDescriptor], set[str]]:
+        """List emulators and probe ``serials`` in a single SSH round-trip.
+
+        Returns the discovered emulators and the subset of ``serials`` whose adb
+        transport reports the ``device`` state. Raises ``RuntimeError`` when
+        ``adb devices`` itself fails, so callers can tell it from "nothing online".
+        """
+        adb = self.adb_executable
+        parts = [f"{adb} devices || exit"]
+        # Probes run as concurrent background jobs; each section is emitted by
+        # a single small printf so parallel writers cannot interleave
+        for serial in serials:
+            quoted = shlex.quote(serial)
+            parts.append(
+                f"{{ state=$({adb} -s {quoted} get-state 2>/dev/null); "
+                f"printf '{_SECTION_MARKER}%s\\n%s\\n' {quoted} \"$state\"; }} &"
+            )
+        parts.append("wait; true")
+        result = self.ssh_session.run("\n".join(parts), timeout=10)
+        if not result.ok:
+            stderr = result.stderr.decode("utf-8", errors="ignore").strip()
+            raise RuntimeError(stderr or f"adb devices exited with {result.exit_code}")
+
+        devices_text, *sections = result.stdout.decode("utf-8", errors="ignore").split(
+            _SECTION_MARKER
+        )
+        # Serials key every per-emulator dict in the app; interned keys let lookups
+        # match on identity before comparing characters
+        descriptors = [
+            EmulatorDescriptor(serial=sys.intern(match[1]), port=int(match[2]))
+            for match in _EMULATOR_LINE_RE.finditer(devices_text)
+        ]
+
+        ready: set[str] = set()
+        for section in sections:
+            serial, _, state = section.partition("\n")
+            if state.strip() == "device":
+                ready.add(sys.intern(serial))
+        return descriptors, ready
+
     def start_stream(self, descriptor: EmulatorDescriptor) -> None:
         with self._lock:
-            if descriptor.serial in self._workers:
+            if descriptor.serial in self._streams:
                 return
-            stop_event = threading.Event()
-            thread = threading.Thread(
-                target=self._frame_worker,
-                name=f"frame-{descriptor.serial}",
-                daemon=True,
-                args=(descriptor, stop_event),
-            )
-            self._workers[descriptor.serial] = _WorkerHandle(
-                descriptor, stop_event, thread
-            )
-            thread.start()
+            self._streams[descriptor.serial] = _StreamHandle(descriptor)
+            if self._scheduler is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=MAX_CAPTURE_WORKERS,
+                    thread_name_prefix="frame-capture",
+                )
+                self._scheduler_stop = threading.Event()
+                self._scheduler = threading.Thread(
+                    target=self._schedule_captures,
+                    name="frame-scheduler",
+                    daemon=True,
+                    args=(self._executor, self._scheduler_stop),
+                )
+                self._scheduler.start()
 
     def stop_stream(self, serial: str) -> None:
         with self._lock:
-            handle = self._workers.pop(serial, None)
-        if handle is None:
-            return
-        handle.stop_event.set()
-        handle.thread.join(timeout=self.interval * 2)
+            handle = self._streams.pop(serial, None)
+            if handle is None:
+                return
+            handle.active = False
+            # A busy handle is closed by its capture task once it finishes
+            if not handle.busy:
+                handle.close_shell()
 
     def stop_all(self) -> None:
         with self._lock:
-            serials = list(self._workers.keys())
+            serials = list(self._streams.keys())
         for serial in serials:
             self.stop_stream(serial)
-
-    def active_serials(self) -> list[str]:
         with self._lock:
-            return list(self._workers.keys())
+            executor, scheduler = self._executor, self._scheduler
+            self._executor = None
+            self._scheduler = None
+            self._scheduler_stop.set()
+        if scheduler is not None:
+            scheduler.join(timeout=self.interval * 2)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
 
-    def _frame_worker(
-        self, descriptor: EmulatorDescriptor, stop_event: threading.Event
+    def active_serials(self) -> KeysView[str]:
+        """Live view of the streamed serials; copy it before starting or stopping."""
+        return self._streams.keys()
+
+    def take_frame(self, serial: str) -> Optional[FrameEvent]:
+        """Pop the newest undelivered frame of ``serial``, if any."""
+        handle = self._streams.get(serial)
+        if handle is None:
+            return None
+        try:
+            return handle.frames.popleft()
+        except IndexError:
+            return None
+
+    def _schedule_captures(
+        self, executor: ThreadPoolExecutor, stop_event: threading.Event
     ) -> None:
-        command = f"{self.adb_executable} -s {descriptor.serial} exec-out screencap -p"
+        # Ticks are anchored to absolute deadlines so capture time does not drift
+        # the cadence; streams still busy from the last tick simply skip one.
+        deadline = time.monotonic()
+        warned_behind = False
         while not stop_event.is_set():
-            result = self.ssh_session.run(command, timeout=20)
-            if result.ok and result.stdout:
-                frame_bytes = result.stdout.replace(b"\r\r\n", b"\n")
-                self.frame_queue.put(
-                    FrameEvent(emulator=descriptor, frame_bytes=frame_bytes)
+            due: list[_StreamHandle] = []
+            lagging: Optional[str] = None
+            with self._lock:
+                for handle in self._streams.values():
+                    if handle.busy:
+                        lagging = handle.descriptor.serial
+                    else:
+                        handle.busy = True
+                        due.append(handle)
+            if lagging is not None and not warned_behind:
+                logger.warning(
+                    "Capturing %s takes longer than the %.2fs interval; "
+                    "slow streams skip ticks",
+                    lagging,
+                    self.interval,
                 )
-            else:
+                warned_behind = True
+            for handle in due:
+                executor.submit(self._capture_frame, handle)
+            deadline += self.interval
+            delay = deadline - time.monotonic()
+            if delay < 0:
+                deadline = time.monotonic()
+                delay = 0.0
+            stop_event.wait(delay)
+
+    def _capture_frame(self, handle: _StreamHandle) -> None:
+        descriptor = handle.descriptor
+        try:
+            # Queued before a stop; opening a shell now could reconnect a closed session
+            if not handle.active:
+                return
+            if handle.shell is None:
+                handle.shell = self._open_shell(descriptor.serial)
+            output = handle.shell.execute("screencap")
+        except (OSError, EOFError, paramiko.SSHException) as exc:
+            logger.error("Failed to capture frame for %s: %s", descriptor.serial, exc)
+            handle.close_shell()
+        else:
+            raw = _parse_raw_header(output)
+            if raw is None:
                 logger.error(
-                    "Failed to capture frame for %s: %s",
+                    "Invalid frame captured for %s (%d bytes)",
                     descriptor.serial,
-                    result.stderr.decode("utf-8", errors="ignore"),
+                    len(output),
+                )
+            elif handle.active:
+                # bytes caches its hash: paying for it here keeps the panel's
+                # repeat-frame check off the GUI thread
+                hash(output)
+                self._publish(
+                    handle, FrameEvent(emulator=descriptor, frame_bytes=output, raw=raw)
                 )
-            stop_event.wait(self.interval)
+        finally:
+            with self._lock:
+                handle.busy = False
+                if not handle.active:
+                    handle.close_shell()
+
+    def _publish(self, handle: _StreamHandle, frame: FrameEvent) -> None:
+        # deque appends are atomic; maxlen=1 drops the undelivered older frame
+        handle.frames.append(frame)
+        if self.on_frame is not None:
+            self.on_frame(frame.emulator.serial)
+
+    def _open_shell(self, serial: str) -> _AdbShell:
+        # ``-T`` keeps adb from allocating a PTY, so binary output arrives unmangled
+        channel = self.ssh_session.open_channel(
+            f"{self.adb_executable} -s {serial} shell -T", timeout=20
+        )
+        return _AdbShell(channel)
 
 
-def _serial_to_port(serial: str) -> int:
-    suffix = serial.split("-", maxsplit=1)[-1]
-    try:
-        return int(suffix)
-    except ValueError:
-        return -1
+def _parse_raw_header(output: bytes) -> Optional[RawFrame]:
+    """Describe a raw ``screencap`` payload, or return ``None`` if it is malformed."""
+    if len(output) < 12:
+        return None
+    width, height, pixel_format = struct.unpack_from("<III", output)
+    bytes_per_pixel = _RAW_BYTES_PER_PIXEL.get(pixel_format)
+    if bytes_per_pixel is None:
+        return None
+    # Newer Android releases append a 4-byte colorspace field to the header
+    offset = len(output) - width * height * bytes_per_pixel
+    if offset not in (12, 16):
+        return None
+    return RawFrame(
+        width=width,
+        height=height,
+        pixel_format=pixel_format,
+        bytes_per_line=width * bytes_per_pixel,
+        offset=offset,
+    )
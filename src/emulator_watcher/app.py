@@ -1,13 +1,21 @@
 from __future__ import annotations
 
+import bisect
 import logging
 import sys
-from functools import partial
+from functools import cache
 from pathlib import Path
-from queue import Empty
-from typing import Optional
-
-from PyQt6.QtCore import Qt, QTimer
+from typing import AbstractSet, Any, Callable, Optional
+
+from PyQt6.QtCore import (
+    QObject,
+    QRunnable,
+    QSignalBlocker,
+    Qt,
+    QThreadPool,
+    pyqtSignal,
+    pyqtSlot,
+)
 from PyQt6.QtGui import QBrush, QColor, QFont, QIcon, QLinearGradient, QPainter, QPixmap
 from PyQt6.QtWidgets import (
     QApplication,
@@ -30,13 +38,13 @@ from .adb_service import ADBService, DEFAULT_ADB_PATH
 from .models import EmulatorDescriptor
 from .ssh_client import SSHSession
 from .ssh_config import SSHConfigLoader
-from .widgets.emulator_panel import EmulatorPanel
+from .widgets.emulator_panel import PANEL_STYLESHEET, EmulatorPanel
 
 PROJECT_ROOT = Path(__file__).resolve().parents[2]
 ICON_PATH = PROJECT_ROOT / "assets" / "icon.png"
+ICON_AVAILABLE = ICON_PATH.exists()
 
 # UI constants
-FRAME_UPDATE_INTERVAL_MS = 200
 DEFAULT_WINDOW_WIDTH = 1920
 DEFAULT_WINDOW_HEIGHT = 1080
 CONTROLS_MIN_WIDTH = 400
@@ -253,7 +261,10 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
     padding: 8px 0;
     background-color: transparent;
 }
+"""
 
+# Applied to the status label alone so its dynamic-property repolish stays local
+STATUS_LABEL_STYLESHEET = """
 #statusLabel {
     background-color: #0d1117;
     color: #8b949e;
@@ -278,6 +289,32 @@ QScrollBar::add-line:horizontal, QScrollBar::sub-line:horizontal {
 """
 
 
+class _FrameSignals(QObject):
+    frame_ready = pyqtSignal(str)
+
+
+class _TaskSignals(QObject):
+    succeeded = pyqtSignal(object)
+    failed = pyqtSignal(str)
+
+
+class _BackgroundTask(QRunnable):
+    """Runs a blocking callable off the GUI thread and reports the outcome."""
+
+    def __init__(self, task: Callable[[], Any]) -> None:
+        super().__init__()
+        self.task = task
+        self.signals = _TaskSignals()
+
+    def run(self) -> None:
+        try:
+            result = self.task()
+        except Exception as exc:  # pragma: no cover - UI feedback
+            self.signals.failed.emit(str(exc))
+        else:
+            self.signals.succeeded.emit(result)
+
+
 class MainWindow(QMainWindow):
     def __init__(self) -> None:
         super().__init__()
@@ -289,13 +326,19 @@ class MainWindow(QMainWindow):
         self.adb_service: Optional[ADBService] = None
         self.emulators: dict[str, EmulatorDescriptor] = {}
         self.panels: dict[str, EmulatorPanel] = {}
+        # Keys of self.panels kept in grid order, maintained as panels come and go
+        self._serial_order: list[str] = []
+        self._item_for_serial: dict[str, QListWidgetItem] = {}
+        self._pending_tasks: set[_BackgroundTask] = set()
+        # True while a session.connect() runs in the background
+        self._connecting = False
 
         self._build_ui()
         self._populate_hosts()
 
-        self.frame_timer = QTimer(self)
-        self.frame_timer.timeout.connect(self._drain_frames)
-        self.frame_timer.start(FRAME_UPDATE_INTERVAL_MS)
+        # Capture threads emit through this bridge; delivery is queued to the GUI thread
+        self.frame_signals = _FrameSignals(self)
+        self.frame_signals.frame_ready.connect(self._dispatch_frame)
 
     def _build_ui(self) -> None:
         self.setStyleSheet(MAIN_STYLESHEET)
@@ -332,6 +375,7 @@ class MainWindow(QMainWindow):
 
         self.status_label = QLabel("● Disconnected")
         self.status_label.setObjectName("statusLabel")
+        self.status_label.setStyleSheet(STATUS_LABEL_STYLESHEET)
         self.status_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         controls_layout.addWidget(self.status_label)
 
@@ -418,12 +462,12 @@ class MainWindow(QMainWindow):
 
         self.start_watch_btn = QPushButton("开始监控")
         self.start_watch_btn.setObjectName("primaryButton")
-        self.start_watch_btn.clicked.connect(partial(self._set_watch_state, True))
+        self.start_watch_btn.clicked.connect(self._start_watching)
         self.start_watch_btn.setEnabled(False)
 
         self.stop_watch_btn = QPushButton("停止监控")
         self.stop_watch_btn.setObjectName("dangerButton")
-        self.stop_watch_btn.clicked.connect(partial(self._set_watch_state, False))
+        self.stop_watch_btn.clicked.connect(self._stop_watching)
         self.stop_watch_btn.setEnabled(False)
 
         watch_buttons.addWidget(self.start_watch_btn)
@@ -434,7 +478,10 @@ class MainWindow(QMainWindow):
 
     def _build_scroll_area(self) -> QScrollArea:
         self.panels_container = QWidget()
-        self.panels_container.setStyleSheet("background-color: #0d1117;")
+        self.panels_container.setObjectName("panelsContainer")
+        self.panels_container.setStyleSheet(
+            "#panelsContainer { background-color: #0d1117; }" + PANEL_STYLESHEET
+        )
 
         self.panels_layout = QGridLayout(self.panels_container)
         self.panels_layout.setContentsMargins(20, 20, 20, 20)
@@ -447,18 +494,20 @@ class MainWindow(QMainWindow):
 
     def _populate_hosts(self) -> None:
         self.hosts = self.host_loader.load()
-        self.host_combo.blockSignals(True)
-        self.host_combo.clear()
-        for host in self.hosts:
-            self.host_combo.addItem(host.display_name(), host)
-        self.host_combo.blockSignals(False)
+        with QSignalBlocker(self.host_combo):
+            self.host_combo.clear()
+            self.host_combo.addItems([host.display_name() for host in self.hosts])
+            for index, host in enumerate(self.hosts):
+                self.host_combo.setItemData(index, host)
         self._update_connect_state()
         if not self.hosts:
             self.status_label.setText("⚠️ ~/.ssh/config 中未找到主机")
             self.status_label.setProperty("status", "error")
-            self.status_label.setStyle(self.status_label.style())
+            _repolish(self.status_label)
 
     def _handle_connect(self) -> None:
+        if self._connecting:
+            return
         if self.ssh_session and self.ssh_session.connected:
             self._disconnect()
             return
@@ -470,25 +519,48 @@ class MainWindow(QMainWindow):
         host = self.host_combo.currentData()
         assert host is not None
         session = SSHSession(host)
-        try:
-            session.connect()
-        except Exception as exc:  # pragma: no cover - UI feedback
-            QMessageBox.critical(self, "Connection failed", str(exc))
-            return
+        self._connecting = True
+        self.connect_btn.setEnabled(False)
+        self.connect_btn.setText("连接中...")
+        self.status_label.setText(f"● 正在连接 {host.alias}...")
+        self.status_label.setProperty("status", "")
+        _repolish(self.status_label)
+
+        def on_connected(_: object) -> None:
+            self._on_connected(session)
+
+        self._run_in_background(session.connect, on_connected, self._on_connect_failed)
+
+    def _on_connected(self, session: SSHSession) -> None:
+        self._connecting = False
         self.ssh_session = session
         adb_executable = self.adb_path_edit.text().strip() or DEFAULT_ADB_PATH
-        self.adb_service = ADBService(session, adb_executable=adb_executable)
+        self.adb_service = ADBService(
+            session,
+            adb_executable=adb_executable,
+            on_frame=self.frame_signals.frame_ready.emit,
+        )
         self.connect_btn.setText("断开")
         self.connect_btn.setObjectName("dangerButton")
-        self.connect_btn.setStyle(self.connect_btn.style())
+        _repolish(self.connect_btn)
+        self._update_connect_state()
         self.refresh_emulators_btn.setEnabled(True)
         self.start_watch_btn.setEnabled(True)
         self.stop_watch_btn.setEnabled(True)
-        self.status_label.setText(f"● 已连接到 {host.alias}")
+        self.status_label.setText(f"● 已连接到 {session.host.alias}")
         self.status_label.setProperty("status", "connected")
-        self.status_label.setStyle(self.status_label.style())
+        _repolish(self.status_label)
         self._refresh_emulators()
 
+    def _on_connect_failed(self, message: str) -> None:
+        self._connecting = False
+        self.connect_btn.setText("连接")
+        self._update_connect_state()
+        self.status_label.setText("● 未连接")
+        self.status_label.setProperty("status", "")
+        _repolish(self.status_label)
+        QMessageBox.critical(self, "Connection failed", message)
+
     def _disconnect(self) -> None:
         if self.adb_service:
             self.adb_service.stop_all()
@@ -498,75 +570,183 @@ class MainWindow(QMainWindow):
             self.ssh_session = None
         self.connect_btn.setText("连接")
         self.connect_btn.setObjectName("primaryButton")
-        self.connect_btn.setStyle(self.connect_btn.style())
+        _repolish(self.connect_btn)
         self.refresh_emulators_btn.setEnabled(False)
         self.start_watch_btn.setEnabled(False)
         self.stop_watch_btn.setEnabled(False)
         self.status_label.setText("● 未连接")
         self.status_label.setProperty("status", "")
-        self.status_label.setStyle(self.status_label.style())
+        _repolish(self.status_label)
         self.emulator_list.clear()
+        self._item_for_serial.clear()
         self.emulators.clear()
         self._clear_panels()
 
     def _refresh_emulators(self) -> None:
-        if not self.adb_service:
+        service = self.adb_service
+        if not service:
             return
-        descriptors = self.adb_service.list_emulators()
+        watched = list(self._active_serials())
+        self.refresh_emulators_btn.setEnabled(False)
+
+        def on_listed(result: tuple[list[EmulatorDescriptor], set[str]]) -> None:
+            if service is self.adb_service:
+                self._apply_emulators(*result, watched)
+
+        def on_failed(message: str) -> None:
+            if service is self.adb_service:
+                self._on_adb_failed(message)
+
+        self._run_in_background(
+            lambda: service.enumerate_and_prime(watched),
+            on_listed,
+            on_failed,
+        )
+
+    def _apply_emulators(
+        self,
+        descriptors: list[EmulatorDescriptor],
+        ready: set[str],
+        watched: list[str],
+    ) -> None:
+        assert self.adb_service is not None
+        self.refresh_emulators_btn.setEnabled(True)
+        # ``ready`` only covers the streams probed with this refresh; streams
+        # started while it ran were probed by their own start and stay untouched
+        active_serials = self._active_serials()
+        for serial in watched:
+            if serial in active_serials and serial not in ready:
+                self.adb_service.stop_stream(serial)
+        self._prune_panels()
         self.emulators = {desc.serial: desc for desc in descriptors}
-        self.emulator_list.clear()
+        # Only touch the rows that changed; surviving items keep their selection
+        for serial in self._item_for_serial.keys() - self.emulators.keys():
+            item = self._item_for_serial.pop(serial)
+            self.emulator_list.takeItem(self.emulator_list.row(item))
         for desc in descriptors:
-            item = QListWidgetItem(f"{desc.serial} (:{desc.port})")
-            item.setData(Qt.ItemDataRole.UserRole, desc.serial)
-            self.emulator_list.addItem(item)
+            label = f"{desc.serial} (:{desc.port})"
+            item = self._item_for_serial.get(desc.serial)
+            if item is None:
+                item = QListWidgetItem(label)
+                item.setData(Qt.ItemDataRole.UserRole, desc)
+                self.emulator_list.addItem(item)
+                self._item_for_serial[desc.serial] = item
+            elif item.text() != label:
+                item.setText(label)
+                item.setData(Qt.ItemDataRole.UserRole, desc)
         if not descriptors:
             self.status_label.setText("⚠️ 服务器上未检测到模拟器")
             self.status_label.setProperty("status", "error")
-            self.status_label.setStyle(self.status_label.style())
+            _repolish(self.status_label)
         else:
             self.status_label.setText(f"● 已连接 - 发现 {len(descriptors)} 个模拟器")
             self.status_label.setProperty("status", "connected")
-            self.status_label.setStyle(self.status_label.style())
+            _repolish(self.status_label)
+
+    def _on_adb_failed(self, message: str) -> None:
+        if self.adb_service:
+            self.refresh_emulators_btn.setEnabled(True)
+        self.status_label.setText(f"⚠️ adb 命令失败: {message}")
+        self.status_label.setProperty("status", "error")
+        _repolish(self.status_label)
+
+    @pyqtSlot()
+    def _start_watching(self) -> None:
+        self._set_watch_state(True)
+
+    @pyqtSlot()
+    def _stop_watching(self) -> None:
+        self._set_watch_state(False)
 
     def _set_watch_state(self, start: bool) -> None:
-        if not self.adb_service:
+        service = self.adb_service
+        if not service:
             return
         selected_items = self.emulator_list.selectedItems()
         if not selected_items:
             QMessageBox.information(self, "No emulator", "Select one or more emulators")
             return
+        descriptors: list[EmulatorDescriptor] = []
         for item in selected_items:
-            serial = item.data(Qt.ItemDataRole.UserRole)
-            descriptor = self.emulators.get(serial)
-            if not descriptor:
-                continue
-            if start:
-                self.adb_service.start_stream(descriptor)
-                self._ensure_panel(descriptor)
-            else:
-                self.adb_service.stop_stream(serial)
+            descriptor = item.data(Qt.ItemDataRole.UserRole)
+            if descriptor is not None:
+                descriptors.append(descriptor)
         if not start:
+            for descriptor in descriptors:
+                service.stop_stream(descriptor.serial)
             self._prune_panels()
+            return
+
+        serials = [descriptor.serial for descriptor in descriptors]
+
+        def on_probed(result: tuple[list[EmulatorDescriptor], set[str]]) -> None:
+            if service is not self.adb_service:
+                return
+            _, ready = result
+            # Create every panel first, then lay the grid out and repaint once
+            self.panels_container.setUpdatesEnabled(False)
+            added = False
+            for descriptor in descriptors:
+                if descriptor.serial not in ready:
+                    logging.warning(
+                        "Skipping %s: emulator is not online", descriptor.serial
+                    )
+                    continue
+                service.start_stream(descriptor)
+                added |= self._ensure_panel(descriptor)
+            if added:
+                self._reflow_panels()
+            self.panels_container.setUpdatesEnabled(True)
+
+        def on_failed(message: str) -> None:
+            if service is self.adb_service:
+                self._on_adb_failed(message)
+
+        self._run_in_background(
+            lambda: service.enumerate_and_prime(serials),
+            on_probed,
+            on_failed,
+        )
 
-    def _ensure_panel(self, descriptor: EmulatorDescriptor) -> None:
+    def _run_in_background(
+        self,
+        task: Callable[[], Any],
+        on_success: Callable[[Any], None],
+        on_failure: Callable[[str], None],
+    ) -> None:
+        """Run a blocking SSH call on the thread pool and report back on the GUI thread."""
+        runnable = _BackgroundTask(task)
+        self._pending_tasks.add(runnable)
+
+        def finish(callback: Callable[[Any], None], value: Any) -> None:
+            self._pending_tasks.discard(runnable)
+            callback(value)
+
+        runnable.signals.succeeded.connect(lambda value: finish(on_success, value))
+        runnable.signals.failed.connect(lambda message: finish(on_failure, message))
+        QThreadPool.globalInstance().start(runnable)
+
+    def _ensure_panel(self, descriptor: EmulatorDescriptor) -> bool:
+        """Create a panel for the emulator; the caller reflows the grid if True."""
         if descriptor.serial in self.panels:
-            return
-        panel = EmulatorPanel(descriptor)
-        self.panels[descriptor.serial] = panel
-        self._reflow_panels()
+            return False
+        self.panels[descriptor.serial] = EmulatorPanel(descriptor)
+        bisect.insort(self._serial_order, descriptor.serial)
+        return True
 
     def _prune_panels(self) -> None:
-        active_serials = set(self._active_serials())
+        active_serials = self._active_serials()
         for serial, panel in list(self.panels.items()):
             if serial not in active_serials:
                 panel.setParent(None)
                 panel.deleteLater()
                 del self.panels[serial]
+                self._serial_order.remove(serial)
         self._reflow_panels()
 
-    def _active_serials(self) -> list[str]:
+    def _active_serials(self) -> AbstractSet[str]:
         if not self.adb_service:
-            return []
+            return frozenset()
         return self.adb_service.active_serials()
 
     def _clear_panels(self) -> None:
@@ -574,47 +754,62 @@ class MainWindow(QMainWindow):
             panel.setParent(None)
             panel.deleteLater()
         self.panels.clear()
+        self._serial_order.clear()
         self._reflow_panels()
 
     def _update_connect_state(self) -> None:
         has_host = self.host_combo.currentIndex() >= 0
         has_adb = bool(self.adb_path_edit.text().strip())
-        self.connect_btn.setEnabled(has_host and has_adb)
+        self.connect_btn.setEnabled(has_host and has_adb and not self._connecting)
 
-    def _drain_frames(self) -> None:
+    @pyqtSlot(str)
+    def _dispatch_frame(self, serial: str) -> None:
         if not self.adb_service:
             return
-        while True:
-            try:
-                frame = self.adb_service.frame_queue.get_nowait()
-            except Empty:
-                break
-            panel = self.panels.get(frame.emulator.serial)
-            if panel:
-                panel.update_frame(frame.frame_bytes, frame.timestamp)
+        # Several notifications may coalesce into one frame; later ones find it gone
+        frame = self.adb_service.take_frame(serial)
+        panel = self.panels.get(serial)
+        if frame and panel:
+            panel.update_frame(frame.frame_bytes, frame.timestamp_ns, frame.raw)
 
     def _reflow_panels(self) -> None:
+        # Suspend geometry updates so the rebuild costs one layout pass, not one
+        # per addWidget
+        self.panels_layout.setEnabled(False)
+        try:
+            self._fill_panels_layout()
+        finally:
+            self.panels_layout.setEnabled(True)
+
+    def _fill_panels_layout(self) -> None:
         # Remove layout references but keep widgets alive for re-adding
         while (item := self.panels_layout.takeAt(0)) is not None:
             widget = item.widget()
             if widget is not None:
                 widget.setParent(self.panels_container)
 
-        panels = [panel for _, panel in sorted(self.panels.items())]
-        count = len(panels)
+        count = len(self._serial_order)
         if count == 0:
             return
         columns = 1 if count == 1 else GRID_COLUMNS
-        for index, panel in enumerate(panels):
+        for index, serial in enumerate(self._serial_order):
             row = index // columns
             col = index % columns
-            self.panels_layout.addWidget(panel, row, col)
+            self.panels_layout.addWidget(self.panels[serial], row, col)
 
     def closeEvent(self, event) -> None:
         self._disconnect()
         super().closeEvent(event)
 
 
+def _repolish(widget: QWidget) -> None:
+    """Re-apply stylesheet rules after a property or object name change."""
+    style = widget.style()
+    style.unpolish(widget)
+    style.polish(widget)
+    widget.update()
+
+
 def main() -> None:
     logging.basicConfig(
         level=logging.INFO, format="[%(levelname)s] %(name)s: %(message)s"
@@ -632,10 +827,11 @@ if __name__ == "__main__":
     main()
 
 
+@cache
 def _build_app_icon(size: int = 256) -> QIcon:
     """Load the shipping icon from assets with a graceful fallback."""
 
-    if ICON_PATH.exists():
+    if ICON_AVAILABLE:
         icon = QIcon(str(ICON_PATH))
         if not icon.isNull():
             return icon
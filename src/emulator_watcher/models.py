@@ -1,11 +1,11 @@
 from __future__ import annotations
 
+import time
 from dataclasses import dataclass, field
-from datetime import datetime
 from typing import Optional
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class SSHHost:
     """Represents an entry from ~/.ssh/config."""
 
@@ -20,7 +20,7 @@ class SSHHost:
         return f"{self.alias} ({user_prefix}{self.hostname}:{self.port})"
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class EmulatorDescriptor:
     """Metadata describing a single Android emulator instance."""
 
@@ -29,15 +29,27 @@ class EmulatorDescriptor:
 
 
 @dataclass(slots=True)
+class RawFrame:
+    """Layout of an uncompressed ``screencap`` payload."""
+
+    width: int
+    height: int
+    pixel_format: int  # android::PixelFormat, e.g. 1 == RGBA_8888
+    bytes_per_line: int
+    offset: int  # size of the header preceding the pixel data
+
+
+@dataclass(slots=True, frozen=True)
 class FrameEvent:
     """Frame data emitted by an emulator streaming worker."""
 
     emulator: EmulatorDescriptor
     frame_bytes: bytes
-    timestamp: datetime = field(default_factory=datetime.now)
+    timestamp_ns: int = field(default_factory=time.time_ns)  # wall clock, for display
+    raw: Optional[RawFrame] = None  # None when frame_bytes holds an encoded image
 
 
-@dataclass(slots=True)
+@dataclass(slots=True, frozen=True)
 class RunResult:
     """Standardized response from SSH command execution."""
 
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import secrets
 import threading
 from typing import Optional
 
@@ -7,6 +8,83 @@ import paramiko
 
 from .models import RunResult, SSHHost
 
+# Receive window for streaming channels. Paramiko's 2 MB default makes a raw
+# ~10 MB frame stall on several window-adjust round-trips; a window larger than
+# a frame lets the remote side send it in one go.
+STREAM_WINDOW_SIZE = 32 * 1024 * 1024
+_RECV_CHUNK_SIZE = 64 * 1024
+
+
+class _ShellClosedError(EOFError):
+    """A pooled shell died before the command produced any output."""
+
+
+class _PooledShell:
+    """Host-side ``sh`` channel that runs successive commands without reopening."""
+
+    def __init__(self, channel: paramiko.Channel, generation: int) -> None:
+        self.channel = channel
+        self.generation = generation  # SSHSession connection the channel belongs to
+        self._marker = f"__EW_{secrets.token_hex(8)}__"
+
+    @property
+    def alive(self) -> bool:
+        return not (self.channel.closed or self.channel.exit_status_ready())
+
+    def run(self, command: str, timeout: Optional[float]) -> RunResult:
+        marker = self._marker.encode()
+        # The subshell keeps `exit` and `cd` from leaking into the pooled shell and
+        # /dev/null keeps commands from eating the framing written to stdin.
+        self.channel.settimeout(timeout)
+        try:
+            self.channel.sendall(
+                (
+                    f"( {command}\n) </dev/null\n"
+                    f"printf '%s %d\\n' {self._marker} $?\n"
+                    f"printf '%s\\n' {self._marker} >&2\n"
+                ).encode()
+            )
+        except TimeoutError:
+            raise
+        except OSError as exc:
+            raise _ShellClosedError("Pooled shell closed") from exc
+
+        out = bytearray()
+        err = bytearray()
+        while True:
+            start = out.find(marker)
+            if start >= 0 and (end := out.find(b"\n", start)) >= 0:
+                break
+            self._drain_stderr(err)
+            chunk = self.channel.recv(_RECV_CHUNK_SIZE)
+            if not chunk:
+                if not out and not err:
+                    raise _ShellClosedError("Pooled shell closed")
+                raise EOFError("Pooled shell closed")
+            out += chunk
+        exit_code = int(out[start + len(marker) : end])
+
+        stderr_end = marker + b"\n"
+        while not err.endswith(stderr_end):
+            chunk = self.channel.recv_stderr(_RECV_CHUNK_SIZE)
+            if not chunk:
+                raise EOFError("Pooled shell closed")
+            err += chunk
+        return RunResult(
+            command=command,
+            stdout=bytes(out[:start]),
+            stderr=bytes(err[: -len(stderr_end)]),
+            exit_code=exit_code,
+        )
+
+    def _drain_stderr(self, err: bytearray) -> None:
+        # stderr shares the channel window with stdout; read it as it arrives
+        while self.channel.recv_stderr_ready():
+            err += self.channel.recv_stderr(_RECV_CHUNK_SIZE)
+
+    def close(self) -> None:
+        self.channel.close()
+
 
 class SSHSession:
     """Thin wrapper around Paramiko's SSHClient with convenience helpers."""
@@ -18,6 +96,10 @@ class SSHSession:
         self.timeout = timeout
         self.banner_timeout = banner_timeout
         self._client: Optional[paramiko.SSHClient] = None
+        self._idle_shells: list[_PooledShell] = []
+        self._generation = 0  # bumped on close so stale shells are not pooled again
+        # Set by close(); late background work must not silently reconnect
+        self._closed = False
         self._lock = threading.RLock()
 
     def __enter__(self) -> "SSHSession":
@@ -36,6 +118,7 @@ class SSHSession:
             if self._client is not None:
                 return
 
+            self._closed = False
             client = paramiko.SSHClient()
             client.load_system_host_keys()
             client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -53,21 +136,76 @@ class SSHSession:
 
     def close(self) -> None:
         with self._lock:
+            self._closed = True
             if self._client is None:
                 return
+            for shell in self._idle_shells:
+                shell.close()
+            self._idle_shells.clear()
+            self._generation += 1
             self._client.close()
             self._client = None
 
     def run(self, command: str, timeout: Optional[float] = None) -> RunResult:
+        # Commands go to an idle pooled shell instead of a fresh exec channel, which
+        # saves the channel-open round-trip on every call. Concurrent callers each
+        # get their own shell; a shell that fails mid-command is discarded.
+        shell = self._checkout_shell()
+        try:
+            try:
+                result = shell.run(command, timeout)
+            except _ShellClosedError:
+                # The channel died while idle (server timeout, remote sh exit) and
+                # the command never ran; retry once on a fresh channel
+                shell.close()
+                shell = self._open_shell()
+                result = shell.run(command, timeout)
+        except BaseException:
+            shell.close()
+            raise
+        with self._lock:
+            if shell.generation == self._generation and shell.alive:
+                self._idle_shells.append(shell)
+                return result
+        shell.close()
+        return result
+
+    def open_channel(
+        self, command: str, timeout: Optional[float] = None
+    ) -> paramiko.Channel:
+        """Start a long-lived command and return its channel for streaming I/O."""
         client = self._ensure_client()
-        stdin, stdout, stderr = client.exec_command(command, timeout=timeout)
-        out = stdout.read()
-        err = stderr.read()
-        exit_status = stdout.channel.recv_exit_status()
-        return RunResult(command=command, stdout=out, stderr=err, exit_code=exit_status)
+        transport = client.get_transport()
+        if transport is None or not transport.is_active():
+            raise paramiko.SSHException("SSH transport is not active")
+        channel = transport.open_session(
+            window_size=STREAM_WINDOW_SIZE, timeout=self.timeout
+        )
+        # No PTY is requested and stderr stays separate so stdout is binary-safe
+        channel.set_combine_stderr(False)
+        channel.settimeout(timeout)
+        channel.exec_command(command)
+        return channel
+
+    def _checkout_shell(self) -> _PooledShell:
+        with self._lock:
+            while self._idle_shells:
+                shell = self._idle_shells.pop()
+                if shell.alive:
+                    return shell
+                shell.close()
+        return self._open_shell()
+
+    def _open_shell(self) -> _PooledShell:
+        generation = self._generation
+        return _PooledShell(self.open_channel("sh"), generation)
 
     def _ensure_client(self) -> paramiko.SSHClient:
-        if self._client is None:
-            self.connect()
-        assert self._client is not None  # for type checkers
-        return self._client
+        with self._lock:
+            # Only an explicit connect() reopens a closed session
+            if self._closed:
+                raise paramiko.SSHException("SSH session is closed")
+            if self._client is None:
+                self.connect()
+            assert self._client is not None  # for type checkers
+            return self._client
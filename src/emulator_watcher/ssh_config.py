@@ -1,64 +1,73 @@
 from __future__ import annotations
 
+import logging
 from pathlib import Path
-from typing import Iterable
+from typing import ClassVar, Iterable
 
 from paramiko.config import SSHConfig
 
 from .models import SSHHost
 
+logger = logging.getLogger(__name__)
+
 
 class SSHConfigLoader:
     """Loads host definitions from the user's SSH config file."""
 
+    # Parsed hosts keyed by (path, mtime_ns, size); a changed file misses the cache
+    _cache: ClassVar[dict[tuple[str, int, int], list[SSHHost]]] = {}
+
     def __init__(self, config_path: Path | None = None) -> None:
         self.config_path = config_path or Path.home() / ".ssh" / "config"
 
     def load(self) -> list[SSHHost]:
-        if not self.config_path.exists():
+        try:
+            stat = self.config_path.stat()
+        except FileNotFoundError:
             return []
 
+        key = (str(self.config_path), stat.st_mtime_ns, stat.st_size)
+        cached = self._cache.get(key)
+        if cached is not None:
+            return list(cached)
+
         with self.config_path.open("r", encoding="utf-8") as handle:
             config = SSHConfig()
             config.parse(handle)
 
         hosts: list[SSHHost] = []
-        for host_entry in self._iter_host_entries(config):
-            alias = host_entry.get("alias")
-            hostname = host_entry.get("hostname")
-            if not alias or not hostname:
-                continue
-
-            user = host_entry.get("user")
+        for alias, own_options in self._iter_aliases(config):
+            try:
+                host_entry = config.lookup(alias)
+            except Exception as exc:  # Match exec without invoke, canonicalization
+                # Fall back to the alias's own Host block rather than hiding it
+                logger.warning("Could not resolve ssh config for %s: %s", alias, exc)
+                host_entry = {"hostname": alias, **own_options}
             identity_files = host_entry.get("identityfile") or []
-            identity_file = identity_files[0] if identity_files else None
-            port = int(host_entry.get("port", 22))
-
             hosts.append(
                 SSHHost(
                     alias=alias,
-                    hostname=hostname,
-                    user=user,
-                    port=port,
-                    identity_file=identity_file,
+                    hostname=host_entry.get("hostname", alias),
+                    user=host_entry.get("user"),
+                    port=int(host_entry.get("port", 22)),
+                    identity_file=identity_files[0] if identity_files else None,
                 )
             )
         hosts.sort(key=lambda host: host.alias.lower())
-        return hosts
 
-    def _iter_host_entries(self, config: SSHConfig) -> Iterable[dict]:
+        # Only the current version of a file is worth keeping
+        for stale in [k for k in self._cache if k[0] == key[0]]:
+            del self._cache[stale]
+        self._cache[key] = hosts
+        return list(hosts)
+
+    def _iter_aliases(self, config: SSHConfig) -> Iterable[tuple[str, dict]]:
+        # SSHConfig.get_hostnames() indexes entry["host"], which Match blocks
+        # lack, so walk the Host entries directly
+        seen: set[str] = set()
         for entry in config._config:
-            hostnames: list[str] = entry.get("host", [])
-            if not hostnames:
-                continue
-            config_dict = entry.get("config", {})
-            for alias in hostnames:
-                if any(token in alias for token in ("*", "?")):
+            for alias in entry.get("host", []):
+                if alias in seen or any(token in alias for token in ("*", "?", "!")):
                     continue
-                yield {
-                    "alias": alias,
-                    "hostname": config_dict.get("hostname", alias),
-                    "user": config_dict.get("user"),
-                    "port": config_dict.get("port", 22),
-                    "identityfile": config_dict.get("identityfile"),
-                }
+                seen.add(alias)
+                yield alias, entry.get("config", {})
@@ -1,22 +1,44 @@
 from __future__ import annotations
 
+import os
 from datetime import datetime
+from functools import cache
 from zoneinfo import ZoneInfo
 
-from PyQt6.QtCore import Qt
-from PyQt6.QtGui import QFont, QPixmap, QColor
+from PyQt6.QtCore import (
+    QObject,
+    QPoint,
+    QRect,
+    QRunnable,
+    Qt,
+    QThreadPool,
+    pyqtSignal,
+    pyqtSlot,
+)
+from PyQt6.QtGui import QColor, QFont, QImage, QPainter, QPixmap, QPixmapCache
 from PyQt6.QtWidgets import (
-    QGraphicsDropShadowEffect,
     QLabel,
     QVBoxLayout,
     QWidget,
 )
 
-from ..models import EmulatorDescriptor
+from ..models import EmulatorDescriptor, RawFrame
 
 TARGET_WIDTH = 360
 TARGET_HEIGHT = int(TARGET_WIDTH * (2400 / 1080))
 BEIJING_TZ = ZoneInfo("Asia/Shanghai")
+FRAME_BACKGROUND = QColor("#0d1117")
+# android::PixelFormat -> matching QImage layout (BGRA_8888 is RGB32 on little-endian).
+# Screen captures are opaque, so alpha formats map to their "X" variants: Qt then
+# skips premultiplying every pixel when scaling and uploading the frame.
+RAW_IMAGE_FORMATS = {
+    1: QImage.Format.Format_RGBX8888,
+    2: QImage.Format.Format_RGBX8888,
+    3: QImage.Format.Format_RGB888,
+    4: QImage.Format.Format_RGB16,
+    5: QImage.Format.Format_RGB32,
+}
+# Installed once on the panels' container by MainWindow, not per panel
 PANEL_STYLESHEET = """
 #emulatorPanel {
     background-color: #161b22;
@@ -34,7 +56,8 @@ PANEL_STYLESHEET = """
     background-color: #0d1117;
     border: 1px solid #21262d;
     border-radius: 8px;
-    color: #8b949e;
+    color: #58a6ff;
+    font-size: 14px;
 }
 #emulatorMeta {
     color: #8b949e;
@@ -49,6 +72,29 @@ PANEL_STYLESHEET = """
     background-color: transparent;
 }
 """
+# Upper bound on frames rendered at once across all panels
+MAX_RENDER_THREADS = min(4, os.cpu_count() or 1)
+
+
+class _RenderSignals(QObject):
+    finished = pyqtSignal(int, object)  # frame hash, QImage or None if undecodable
+
+
+class _RenderTask(QRunnable):
+    """Scales a captured frame to panel size on a pool thread."""
+
+    def __init__(
+        self, frame_bytes: bytes, raw: RawFrame | None, frame_hash: int
+    ) -> None:
+        super().__init__()
+        self.frame_bytes = frame_bytes
+        self.raw = raw
+        self.frame_hash = frame_hash
+        self.signals = _RenderSignals()
+
+    def run(self) -> None:
+        image = _render_frame(self.frame_bytes, self.raw)
+        self.signals.finished.emit(self.frame_hash, image)
 
 
 class EmulatorPanel(QWidget):
@@ -59,6 +105,13 @@ class EmulatorPanel(QWidget):
     ) -> None:
         super().__init__(parent)
         self.descriptor = descriptor
+        self._last_frame_hash: int | None = None
+        self._last_second = -1
+        self._last_time_text = ""
+        # At most one render in flight per panel so results land in order;
+        # frames arriving meanwhile collapse into the newest pending one
+        self._render_task: _RenderTask | None = None
+        self._pending_frame: tuple[bytes, RawFrame | None] | None = None
 
         self.setObjectName("emulatorPanel")
 
@@ -83,12 +136,6 @@ class EmulatorPanel(QWidget):
         self.frame_label.setObjectName("frameSurface")
         self.frame_label.setAlignment(Qt.AlignmentFlag.AlignCenter)
         self.frame_label.setMinimumSize(TARGET_WIDTH, TARGET_HEIGHT)
-        self.frame_label.setStyleSheet("""
-            #frameSurface {
-                font-size: 14px;
-                color: #58a6ff;
-            }
-        """)
 
         self.meta_label = QLabel("空闲")
         self.meta_label.setObjectName("emulatorMeta")
@@ -106,27 +153,96 @@ class EmulatorPanel(QWidget):
         layout.addWidget(self.frame_label)
         layout.addWidget(self.meta_label)
 
-        # Apply a subtle shadow for depth
-        shadow = QGraphicsDropShadowEffect(self)
-        shadow.setBlurRadius(20)
-        shadow.setXOffset(0)
-        shadow.setYOffset(4)
-        shadow.setColor(QColor(0, 0, 0, 180))
-        self.setGraphicsEffect(shadow)
-
-        self.setStyleSheet(PANEL_STYLESHEET)
-
-    def update_frame(self, frame_bytes: bytes, timestamp: datetime) -> None:
-        pixmap = QPixmap()
-        if pixmap.loadFromData(frame_bytes, format="PNG"):
-            scaled = pixmap.scaled(
-                TARGET_WIDTH,
-                TARGET_HEIGHT,
-                Qt.AspectRatioMode.KeepAspectRatio,
-                Qt.TransformationMode.SmoothTransformation,
-            )
+    def update_frame(
+        self, frame_bytes: bytes, timestamp_ns: int, raw: RawFrame | None = None
+    ) -> None:
+        # The label has one-second resolution; format at most once per second
+        second = timestamp_ns // 1_000_000_000
+        if second != self._last_second:
+            local_time = datetime.fromtimestamp(second, BEIJING_TZ)
+            self._last_second = second
+            self._last_time_text = f"{local_time.strftime('%H:%M:%S')} 北京时间"
+        self.meta_label.setText(self._last_time_text)
+
+        if self._render_task is not None:
+            self._pending_frame = (frame_bytes, raw)
+            return
+        self._show_frame(frame_bytes, raw)
+
+    def _show_frame(self, frame_bytes: bytes, raw: RawFrame | None) -> None:
+        frame_hash = hash(frame_bytes)
+        # Same content as the frame on screen: nothing to redraw
+        if frame_hash == self._last_frame_hash:
+            return
+        # Idle emulators resend identical frames; reuse the already scaled pixmap
+        scaled = QPixmapCache.find(self._cache_key(frame_hash))
+        if scaled is not None:
+            self.frame_label.setPixmap(scaled)
+            self._last_frame_hash = frame_hash
+            return
+        self._render_task = _RenderTask(frame_bytes, raw, frame_hash)
+        self._render_task.signals.finished.connect(self._on_rendered)
+        _render_pool().start(self._render_task)
+
+    @pyqtSlot(int, object)
+    def _on_rendered(self, frame_hash: int, image: QImage | None) -> None:
+        self._render_task = None
+        if image is not None:
+            scaled = QPixmap.fromImage(image)
+            QPixmapCache.insert(self._cache_key(frame_hash), scaled)
             self.frame_label.setPixmap(scaled)
-            local_time = timestamp.astimezone(BEIJING_TZ)
-            self.meta_label.setText(f"{local_time.strftime('%H:%M:%S')} 北京时间")
+            self._last_frame_hash = frame_hash
         else:
             self.meta_label.setText("无法解码画面")
+        if self._pending_frame is not None:
+            frame_bytes, raw = self._pending_frame
+            self._pending_frame = None
+            self._show_frame(frame_bytes, raw)
+
+    def _cache_key(self, frame_hash: int) -> str:
+        return f"{self.descriptor.serial}:{frame_hash:x}"
+
+
+@cache
+def _render_pool() -> QThreadPool:
+    pool = QThreadPool()
+    pool.setMaxThreadCount(MAX_RENDER_THREADS)
+    return pool
+
+
+def _render_frame(frame_bytes: bytes, raw: RawFrame | None) -> QImage | None:
+    """Scale a captured frame to panel size, letterboxed; None if undecodable."""
+    # Draw the full-size image, which wraps the captured buffer, straight into a
+    # panel-sized one. Each render gets a fresh target: the previous one is shared
+    # with the pixmap on screen and in QPixmapCache, so painting into it again
+    # would detach and copy anyway. QImage and QPainter are safe off the GUI thread.
+    with memoryview(frame_bytes) as view:
+        if raw is None:
+            image = QImage.fromData(view, "PNG")
+        elif (image_format := RAW_IMAGE_FORMATS.get(raw.pixel_format)) is not None:
+            image = QImage(
+                view[raw.offset :],
+                raw.width,
+                raw.height,
+                raw.bytes_per_line,
+                image_format,
+            )
+        else:
+            return None
+        if image.isNull():
+            return None
+        target = QImage(TARGET_WIDTH, TARGET_HEIGHT, QImage.Format.Format_RGB32)
+        rect = QRect(
+            QPoint(0, 0),
+            image.size().scaled(target.size(), Qt.AspectRatioMode.KeepAspectRatio),
+        )
+        rect.moveCenter(target.rect().center())
+        if rect != target.rect():
+            target.fill(FRAME_BACKGROUND)
+        painter = QPainter(target)
+        # Nearest-neighbour scaling is intentional: bilinear filtering of a full
+        # frame costs far more and is barely visible at panel size
+        painter.setRenderHint(QPainter.RenderHint.SmoothPixmapTransform, False)
+        painter.drawImage(rect, image)
+        painter.end()
+    return target